@@ -0,0 +1,133 @@
+# app/bundle.py
+"""Snapshot bundles: the app configs (topology) and latest AppSnapshots in one compact file.
+
+Layout: 16 byte header (magic b"FADS", format version, payload length) followed by a
+zstd frame holding a msgpack map. The file is memory mapped on load so the payload
+is decompressed straight from the page cache.
+
+CLI (run from backend/):
+  python -m app.bundle export --out fleet.fads     # sweep now and write a bundle
+  python -m app.bundle import fleet.fads           # validate and install as the service's startup bundle
+  python -m app.bundle inspect fleet.fads
+"""
+import argparse
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List
+
+import msgpack
+import zstandard
+from app.models import AppConfig, AppSnapshot
+
+MAGIC = b"FADS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHxxQ")
+ZSTD_LEVEL = 9
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUNDLE_PATH = os.environ.get("FAD_SNAPSHOT_BUNDLE") or os.path.join(BASE_DIR, "../model/out/snapshots.fads")
+
+class BundleError(ValueError):
+  pass
+
+@dataclass
+class Bundle:
+  created: str
+  configs: List[AppConfig] = field(default_factory=list)
+  snapshots: Dict[str, AppSnapshot] = field(default_factory=dict)
+  version: int = FORMAT_VERSION
+
+def dumps(bundle: Bundle) -> bytes:
+  payload = msgpack.packb({
+    "created": bundle.created,
+    "configs": [c.model_dump(mode="json") for c in bundle.configs],
+    "snapshots": {name: s.model_dump(mode="json") for name, s in bundle.snapshots.items()},
+  }, use_bin_type=True)
+  return HEADER.pack(MAGIC, FORMAT_VERSION, len(payload)) + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+
+def loads(data) -> Bundle:
+  """Parse a bundle from bytes or any buffer (e.g. an mmap). Any malformed bundle raises BundleError."""
+  # Views are released explicitly: a traceback that still held one would keep an mmap from closing
+  with memoryview(data) as view:
+    if len(view) < HEADER.size:
+      raise BundleError("Truncated snapshot bundle")
+    magic, version, size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+      raise BundleError("Not a snapshot bundle")
+    if version != FORMAT_VERSION:
+      raise BundleError(f"Unsupported snapshot bundle version {version} (expected {FORMAT_VERSION})")
+    try:
+      with view[HEADER.size:] as body:
+        packed = zstandard.ZstdDecompressor().decompress(body, max_output_size=size)
+      payload = msgpack.unpackb(packed, raw=False)
+    except (zstandard.ZstdError, ValueError, TypeError) as e:
+      raise BundleError(f"Corrupt snapshot bundle payload: {e!r}") from None
+  try:
+    return Bundle(
+      created=payload["created"],
+      configs=[AppConfig(**c) for c in payload["configs"]],
+      snapshots={name: AppSnapshot(**s) for name, s in payload["snapshots"].items()},
+      version=version,
+    )
+  except (KeyError, TypeError, AttributeError, ValueError) as e:
+    raise BundleError(f"Invalid snapshot bundle contents: {e}") from None
+
+def save_bundle(path: str, configs: List[AppConfig], snapshots: Dict[str, AppSnapshot], created: str = None) -> Bundle:
+  """Write a bundle atomically (temp file + rename) so readers never see a partial file."""
+  bundle = Bundle(created=created or datetime.now().isoformat(), configs=list(configs), snapshots=dict(snapshots))
+  directory = os.path.dirname(os.path.abspath(path))
+  os.makedirs(directory, exist_ok=True)
+  fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+  try:
+    with os.fdopen(fd, "wb") as f:
+      f.write(dumps(bundle))
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+  except BaseException:
+    os.unlink(tmp_path)
+    raise
+  return bundle
+
+def load_bundle(path: str) -> Bundle:
+  with open(path, "rb") as f:
+    if os.fstat(f.fileno()).st_size == 0:
+      raise BundleError("Truncated snapshot bundle")
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      return loads(mapped)
+
+def main():
+  parser = argparse.ArgumentParser(description="Export, import and inspect FAD snapshot bundles.")
+  sub = parser.add_subparsers(dest="command", required=True)
+  export = sub.add_parser("export", help="Refresh all app snapshots now and write them to a bundle")
+  export.add_argument("--out", default=DEFAULT_BUNDLE_PATH, help="Bundle file to write")
+  install = sub.add_parser("import", help="Validate a bundle and install it as the service's startup bundle")
+  install.add_argument("bundle", help="Bundle file to import")
+  install.add_argument("--dest", default=DEFAULT_BUNDLE_PATH, help="Where the service loads its bundle from")
+  inspect = sub.add_parser("inspect", help="Print a bundle summary")
+  inspect.add_argument("bundle", help="Bundle file to inspect")
+  args = parser.parse_args()
+
+  if args.command == "export":
+    from app.main import load_app_configs, refresh_all
+    configs = load_app_configs()
+    bundle = save_bundle(args.out, configs, refresh_all(configs, {}))
+    print(f"Exported {len(bundle.snapshots)} snapshots to {args.out} ({os.path.getsize(args.out)} bytes)")
+  elif args.command == "import":
+    bundle = load_bundle(args.bundle)
+    os.makedirs(os.path.dirname(os.path.abspath(args.dest)), exist_ok=True)
+    shutil.copyfile(args.bundle, args.dest + ".tmp")
+    os.replace(args.dest + ".tmp", args.dest)
+    print(f"Imported {len(bundle.snapshots)} snapshots (created {bundle.created}) to {args.dest}")
+  else:
+    bundle = load_bundle(args.bundle)
+    print(f"version: {bundle.version}\ncreated: {bundle.created}\napps: {', '.join(sorted(bundle.snapshots)) or '-'}")
+    for name, snapshot in sorted(bundle.snapshots.items()):
+      print(f"  {name}: {snapshot.app_snapshot_id} @ {snapshot.app_snapshot_timestamp} ({len(snapshot.app.environments)} envs)")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,174 @@
+# app/log.py
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional
+
+# Context carried on every log line; set per request / per collected app
+_log_context: contextvars.ContextVar = contextvars.ContextVar("fad_log_context", default={})
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+@contextmanager
+def log_context(**fields):
+  """Add context fields (app, env, pipeline, account, request_id) to log lines emitted inside the block."""
+  token = _log_context.set({**_log_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+  try:
+    yield
+  finally:
+    _log_context.reset(token)
+
+class ContextFilter(logging.Filter):
+  """Copies the current log context onto the record. Runs in the caller, before the queue hop."""
+  def filter(self, record):
+    for key, value in _log_context.get().items():
+      setattr(record, key, value)
+    return True
+
+class RateLimitFilter(logging.Filter):
+  """Lets at most `burst` records per (logger, message template) through every `period` seconds.
+
+  Records at WARNING and above always pass. The first record after a window that
+  dropped messages carries `suppressed=<count>` so the loss is visible.
+  """
+  def __init__(self, burst: int = 20, period: float = 60.0):
+    super().__init__()
+    self.burst = burst
+    self.period = period
+    self._windows = {}
+    self._lock = threading.Lock()
+
+  def filter(self, record):
+    if record.levelno >= logging.WARNING:
+      return True
+    key = (record.name, record.msg)
+    now = time.monotonic()
+    with self._lock:
+      start, count, suppressed = self._windows.get(key, (now, 0, 0))
+      if now - start >= self.period:
+        if suppressed:
+          record.suppressed = suppressed
+        start, count, suppressed = now, 0, 0
+      if count >= self.burst:
+        self._windows[key] = (start, count, suppressed + 1)
+        return False
+      self._windows[key] = (start, count + 1, suppressed)
+    return True
+
+class JsonFormatter(logging.Formatter):
+  """One JSON object per line: ts, level, logger, msg, context fields and any `extra` data."""
+  _reserved = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+  def format(self, record):
+    entry = {
+      "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+      "level": record.levelname,
+      "logger": record.name,
+      "msg": record.getMessage(),
+    }
+    for key, value in vars(record).items():
+      if key not in self._reserved and not key.startswith("_"):
+        entry[key] = value
+    if record.exc_info and not record.exc_text:
+      record.exc_text = self.formatException(record.exc_info)
+    if record.exc_text:
+      entry["exc"] = record.exc_text
+    return json.dumps(entry, default=str)
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+  """Non-blocking handler: the caller only interpolates the message and enqueues it.
+
+  Unlike the stock QueueHandler, `extra` fields and the traceback stay structured
+  so the JSON formatter in the listener thread can emit them as separate keys.
+  """
+  def prepare(self, record):
+    record = logging.makeLogRecord(vars(record))
+    record.msg = record.getMessage()
+    record.args = None
+    if record.exc_info:
+      record.exc_text = logging.Formatter().formatException(record.exc_info)
+      record.exc_info = None
+    return record
+
+  def enqueue(self, record):
+    try:
+      self.queue.put_nowait(record)
+    except queue.Full:
+      pass  # drop rather than block a request handler or collector
+
+def parse_levels(spec: str) -> dict:
+  """Parse "fetchers=DEBUG,app.models=WARNING" into {logger name: level}."""
+  levels = {}
+  for part in filter(None, (p.strip() for p in spec.split(","))):
+    name, _, level = part.partition("=")
+    levels[name.strip()] = level.strip().upper()
+  return levels
+
+# uvicorn installs its own plain-text, synchronous handlers on these (with propagate=False)
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+def setup_logging(level: Optional[str] = None, component_levels: Optional[dict] = None, queue_size: int = 10000):
+  """Configure root logging: JSON lines on stderr behind a queue, per-component levels.
+
+  Levels default to FAD_LOG_LEVEL (root) and FAD_LOG_LEVELS ("name=LEVEL,...").
+  uvicorn's server and access loggers are routed through the same queue.
+  Safe to call more than once; only the first call installs handlers.
+  """
+  global _listener
+  root = logging.getLogger()
+  root.setLevel(level or os.environ.get("FAD_LOG_LEVEL", "INFO").upper())
+  levels = parse_levels(os.environ.get("FAD_LOG_LEVELS", ""))
+  levels.update(component_levels or {})
+  for name, component_level in levels.items():
+    logging.getLogger(name).setLevel(component_level)
+  for name in UVICORN_LOGGERS:
+    uvicorn_logger = logging.getLogger(name)
+    for handler in uvicorn_logger.handlers[:]:
+      uvicorn_logger.removeHandler(handler)
+    uvicorn_logger.propagate = True
+  if _listener is not None:
+    return
+
+  stream_handler = logging.StreamHandler(sys.stderr)
+  stream_handler.setFormatter(JsonFormatter())
+  log_queue = queue.Queue(maxsize=queue_size)
+  queue_handler = StructuredQueueHandler(log_queue)
+  queue_handler.addFilter(RateLimitFilter())
+  queue_handler.addFilter(ContextFilter())
+  for handler in root.handlers[:]:
+    root.removeHandler(handler)
+  root.addHandler(queue_handler)
+
+  _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+  _listener.start()
+  atexit.register(_listener.stop)
+
+class RequestContextMiddleware:
+  """Pure ASGI middleware binding a request id (X-Request-ID or generated) to the log context."""
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+    headers = dict(scope.get("headers") or [])
+    request_id = headers.get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex
+
+    async def send_wrapper(message):
+      if message["type"] == "http.response.start":
+        message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+      await send(message)
+
+    with log_context(request_id=request_id):
+      await self.app(scope, receive, send_wrapper)
@@ -1,23 +1,67 @@
 # app/main.py
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
+import asyncio
 import glob
+import hmac
 import json
+import logging
 import os
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 from datetime import datetime
+from app.log import setup_logging, log_context, RequestContextMiddleware
+setup_logging()  # before app.models, which logs at import time
+from app import metrics
+from app.bundle import DEFAULT_BUNDLE_PATH, BundleError, load_bundle, save_bundle
+from app.profiler import PROFILER
+from app.templating import build_templates, precompile, stream_template
+from fetchers.ingest import apply_ingested, build_ingestor
 from app.models import AppConfig, AppSnapshot, Environment, Metrics, Uptime, Requests, Errors, Latency, ResourceUsage, SnapshotSource, Commit, Jira, JiraTicket, ServiceNow, ServiceNowTicket, Doc, Version, Deployment, DNS, Certificate, AWSEnv, Cost, Logs, LogEntry, Vulnerabilities, Vulnerability, Security
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "../model")
-TEMPLATES = Jinja2Templates(directory=os.path.join(BASE_DIR, "../web/templates"))
+BUNDLE_PATH = DEFAULT_BUNDLE_PATH
+# before any client exists: botocore copies the session's event hooks when a client is created
+metrics.instrument_boto3()
+INGESTOR = build_ingestor()
+TEMPLATES = build_templates(os.path.join(BASE_DIR, "../web/templates"))
+# Detail page tabs served as fragments; the ones whose size grows with snapshot data are streamed
+APP_TABS = {"overview", "environments", "source", "docs", "metrics", "security", "logs", "tickets"}
+STREAMED_TABS = {"environments", "source", "metrics", "security", "logs", "tickets"}
 
 def load_json(file_path: str) -> dict:
     with open(file_path, "r") as f:
         return json.load(f)
 
+def render(name: str, context: dict):
+    """Render a template response, recording render time per template."""
+    start = time.perf_counter()
+    try:
+        return TEMPLATES.TemplateResponse(name, context)
+    finally:
+        metrics.TEMPLATE_RENDER_SECONDS.labels(template=name).observe(time.perf_counter() - start)
+
+def refresh_snapshot(config: AppConfig, ingested: Optional[Dict[str, Dict]] = None) -> AppSnapshot:
+    """Build a fresh AppSnapshot for one app, recording duration and failures.
+
+    `ingested` holds the bulk ticket/commit results of this refresh ({section: {app_name: value}}).
+    """
+    start = time.perf_counter()
+    try:
+        return AppSnapshot(**apply_ingested(mock_snapshot(config.app_name, config), config.app_name, ingested))
+    except Exception:
+        metrics.SNAPSHOT_REFRESH_FAILURES.labels(app=config.app_name).inc()
+        raise
+    finally:
+        metrics.SNAPSHOT_REFRESH_SECONDS.labels(app=config.app_name).observe(time.perf_counter() - start)
+
 def mock_snapshot(app_name: str, config: AppConfig) -> Dict:
     """Generate a mock AppSnapshot based on AppConfig (replace with AWS fetch later)."""
     now = datetime.now()
@@ -98,42 +142,149 @@ def mock_snapshot(app_name: str, config: AppConfig) -> Dict:
         }
     }
 
-@app.on_event("startup")
-async def validate_configs():
+def load_app_configs() -> List[AppConfig]:
+    """Load and validate every model/app.config-*.json."""
     config_files = glob.glob(os.path.join(MODEL_DIR, "app.config-*.json"))
     if not config_files:
         raise RuntimeError("No app config files found")
     validated_configs: List[AppConfig] = []
-    snapshots: Dict[str, AppSnapshot] = {}
     for config_file in config_files:
         try:
-            data = load_json(config_file)
-            config = AppConfig(**data)
+            config = AppConfig(**load_json(config_file))
             validated_configs.append(config)
-            snapshot_data = mock_snapshot(config.app_name, config)
-            snapshots[config.app_name] = AppSnapshot(**snapshot_data)
-            print(f"Validated: {config_file} (app: {config.app_name})")
+            logger.info("Validated config", extra={"config_file": config_file, "app": config.app_name})
         except Exception as e:
             raise RuntimeError(f"Validation failed for {config_file}: {e}")
-    app.state.app_configs = validated_configs
-    app.state.app_snapshots = snapshots
+    return validated_configs
+
+def refresh_all(configs: List[AppConfig], previous: Dict[str, AppSnapshot]) -> Dict[str, AppSnapshot]:
+    """Refresh every app snapshot; an app that fails keeps its previous snapshot."""
+    ingested = INGESTOR.run(configs)
+    snapshots: Dict[str, AppSnapshot] = {}
+    for config in configs:
+        with log_context(app=config.app_name):
+            try:
+                snapshots[config.app_name] = refresh_snapshot(config, ingested)
+            except Exception:
+                if config.app_name not in previous:
+                    raise
+                logger.exception("Snapshot refresh failed, keeping previous snapshot")
+                snapshots[config.app_name] = previous[config.app_name]
+    return snapshots
+
+def save_snapshots():
+    try:
+        save_bundle(BUNDLE_PATH, app.state.app_configs, app.state.app_snapshots)
+    except OSError:
+        logger.exception("Could not write snapshot bundle", extra={"path": BUNDLE_PATH})
+
+async def catch_up_refresh():
+    """Background refresh after serving a stale bundle at startup."""
+    try:
+        app.state.app_snapshots = await run_in_threadpool(refresh_all, app.state.app_configs, app.state.app_snapshots)
+        app.state.snapshot_stale_since = None
+        await run_in_threadpool(save_snapshots)
+        logger.info("Snapshot catch-up refresh complete")
+    except Exception:
+        logger.exception("Snapshot catch-up refresh failed; still serving bundle", extra={"stale_since": app.state.snapshot_stale_since})
+
+@app.on_event("startup")
+async def validate_configs():
+    logger.info("Precompiled templates", extra={"count": precompile(TEMPLATES)})
+    if os.environ.get("FAD_PROFILER") == "1":
+        PROFILER.start()
+    configs = load_app_configs()
+    app.state.app_configs = configs
+    app.state.snapshot_stale_since = None
+
+    bundle = None
+    if os.path.exists(BUNDLE_PATH):
+        try:
+            bundle = load_bundle(BUNDLE_PATH)
+        except (BundleError, OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable snapshot bundle: %s", e, extra={"path": BUNDLE_PATH})
+    if bundle and all(c.app_name in bundle.snapshots for c in configs):
+        # Serve the bundle right away, marked stale, while a full refresh runs in the background
+        app.state.app_snapshots = {c.app_name: bundle.snapshots[c.app_name] for c in configs}
+        app.state.snapshot_stale_since = bundle.created
+        app.state.refresh_task = asyncio.create_task(catch_up_refresh())
+        logger.info("Serving snapshot bundle", extra={"path": BUNDLE_PATH, "stale_since": bundle.created})
+    else:
+        app.state.app_snapshots = await run_in_threadpool(refresh_all, configs, {})
+        await run_in_threadpool(save_snapshots)
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
-    return TEMPLATES.TemplateResponse("index.html", {"request": request})
+    return render("index.html", {"request": request})
 
 @app.get("/app-tiles", response_class=HTMLResponse)
 async def app_tiles(request: Request):
-    return TEMPLATES.TemplateResponse("app-tile-grid.html", {"request": request, "configs": app.state.app_configs, "snapshots": app.state.app_snapshots})
+    return render("app-tile-grid.html", {"request": request, "configs": app.state.app_configs, "snapshots": app.state.app_snapshots, "stale_since": app.state.snapshot_stale_since})
 
 @app.get("/configs")
 async def list_configs():
     return {"configs": [{"app_name": c.app_name, "app_desc": c.app_desc} for c in app.state.app_configs]}
 
+@app.get("/vulnerabilities")
+async def fleet_vulnerabilities():
+    """Open / critical vulnerability counts for every app environment, most critical first; unscanned ones last."""
+    rows = [
+        {"app": name, "env": env.env, "open": env.security.vulnerabilities.open, "critical": env.security.vulnerabilities.critical, "scanned": env.security.vulnerabilities.scanned}
+        for name, snapshot in app.state.app_snapshots.items() for env in snapshot.app.environments
+    ]
+    return {"environments": sorted(rows, key=lambda r: (not r["scanned"], -r["critical"], -r["open"], r["app"], r["env"]))}
+
 @app.get("/app/{app_name}", response_class=HTMLResponse)
 async def app_detail(request: Request, app_name: str):
     config = next((c for c in app.state.app_configs if c.app_name == app_name), None)
     snapshot = app.state.app_snapshots.get(app_name)
     if not config or not snapshot:
         return HTMLResponse("App not found", status_code=404)
-    return TEMPLATES.TemplateResponse("app-detail.html", {"request": request, "config": config, "snapshot": snapshot})
\ No newline at end of file
+    return render("app-detail.html", {"request": request, "config": config, "snapshot": snapshot, "stale_since": app.state.snapshot_stale_since})
+
+@app.get("/app/{app_name}/tab/{tab}", response_class=HTMLResponse)
+async def app_detail_tab(request: Request, app_name: str, tab: str):
+    config = next((c for c in app.state.app_configs if c.app_name == app_name), None)
+    snapshot = app.state.app_snapshots.get(app_name)
+    if not config or not snapshot or tab not in APP_TABS:
+        return HTMLResponse("Tab not found", status_code=404)
+    name = f"tabs/{tab}.html"
+    context = {"request": request, "config": config, "snapshot": snapshot, "stale_since": app.state.snapshot_stale_since}
+    if tab in STREAMED_TABS:
+        return StreamingResponse(stream_template(TEMPLATES, name, context), media_type="text/html")
+    return render(name, context)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    metrics.observe_snapshot_age({
+        name: datetime.fromisoformat(s.app_snapshot_timestamp).timestamp()
+        for name, s in app.state.app_snapshots.items()
+    })
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+def debug_allowed(request: Request) -> bool:
+    """/debug routes are off unless FAD_DEBUG_TOKEN is set, and then need it in X-Debug-Token."""
+    token = os.environ.get("FAD_DEBUG_TOKEN")
+    return bool(token) and hmac.compare_digest(request.headers.get("X-Debug-Token", ""), token)
+
+@app.post("/debug/profiler/{action}")
+async def toggle_profiler(request: Request, action: str, interval: float = 0.01):
+    if not debug_allowed(request):
+        return PlainTextResponse("Not found", status_code=404)
+    if action == "start":
+        try:
+            PROFILER.start(interval)
+        except ValueError as e:
+            return PlainTextResponse(str(e), status_code=400)
+    elif action == "stop":
+        PROFILER.stop()
+    else:
+        return PlainTextResponse("action must be start or stop", status_code=400)
+    return {"running": PROFILER.running, "interval": PROFILER.interval}
+
+@app.get("/debug/profiler", response_class=PlainTextResponse)
+async def profiler_samples(request: Request):
+    if not debug_allowed(request):
+        return PlainTextResponse("Not found", status_code=404)
+    return PROFILER.collapsed()
\ No newline at end of file
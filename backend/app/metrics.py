@@ -0,0 +1,146 @@
+# app/metrics.py
+import os
+import time
+from typing import Optional
+
+import boto3
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import multiprocess
+
+# Buckets sized for a dashboard: sub-ms template renders up to multi-second AWS sweeps
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+  "fad_http_request_duration_seconds", "HTTP request latency by route",
+  ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+TEMPLATE_RENDER_SECONDS = Histogram(
+  "fad_template_render_seconds", "Jinja2 template render time",
+  ["template"], buckets=LATENCY_BUCKETS,
+)
+SNAPSHOT_REFRESH_SECONDS = Histogram(
+  "fad_snapshot_refresh_seconds", "App snapshot refresh duration",
+  ["app"], buckets=LATENCY_BUCKETS,
+)
+SNAPSHOT_REFRESH_FAILURES = Counter(
+  "fad_snapshot_refresh_failures_total", "App snapshot refresh failures",
+  ["app"],
+)
+SNAPSHOT_AGE_SECONDS = Gauge(
+  "fad_snapshot_age_seconds", "Seconds since the app snapshot was taken",
+  ["app"], multiprocess_mode="max",
+)
+AWS_API_CALLS = Counter(
+  "fad_aws_api_calls_total", "AWS API calls by service and operation",
+  ["service", "operation", "outcome"],
+)
+AWS_API_SECONDS = Histogram(
+  "fad_aws_api_call_seconds", "AWS API call latency by service and operation",
+  ["service", "operation"], buckets=LATENCY_BUCKETS,
+)
+AWS_THROTTLES = Counter(
+  "fad_aws_throttles_total", "AWS throttling errors by service and operation",
+  ["service", "operation"],
+)
+AWS_RETRIES = Counter(
+  "fad_aws_retries_total", "AWS API call retries by service and operation",
+  ["service", "operation"],
+)
+AWS_RETRY_BUDGET_EXHAUSTED = Counter(
+  "fad_aws_retry_budget_exhausted_total", "Retries refused because the retry budget was empty",
+  ["service"],
+)
+INGEST_SECONDS = Histogram(
+  "fad_ingest_seconds", "Ticket/commit ingestion duration by source",
+  ["source"], buckets=LATENCY_BUCKETS,
+)
+INGEST_FAILURES = Counter(
+  "fad_ingest_failures_total", "Ticket/commit ingestion failures by source",
+  ["source"],
+)
+CACHE_REQUESTS = Counter(
+  "fad_cache_requests_total", "Cache lookups by cache and result",
+  ["cache", "result"],
+)
+
+_START_KEY = "fad_metrics_start"
+
+def record_cache(cache: str, hit: bool):
+  """Count a cache lookup as a hit or a miss."""
+  CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+def observe_snapshot_age(snapshot_timestamps: dict):
+  """Set the snapshot age gauge from a mapping of app name to snapshot timestamp (epoch seconds)."""
+  now = time.time()
+  for app_name, taken_at in snapshot_timestamps.items():
+    SNAPSHOT_AGE_SECONDS.labels(app=app_name).set(max(0.0, now - taken_at))
+
+def render_latest() -> tuple:
+  """Return (body, content_type) in Prometheus text format, aggregating workers when multiprocess mode is on."""
+  if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+  return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+# botocore event hooks - time every API call made through an instrumented session
+
+def _before_call(context, **kwargs):
+  context[_START_KEY] = time.perf_counter()
+
+def _record_call(event_name, context, outcome):
+  # event names look like "after-call.<service>.<Operation>"
+  _, service, operation = event_name.split(".", 2)
+  start = context.pop(_START_KEY, None)
+  AWS_API_CALLS.labels(service=service, operation=operation, outcome=outcome).inc()
+  if start is not None:
+    AWS_API_SECONDS.labels(service=service, operation=operation).observe(time.perf_counter() - start)
+
+def _after_call(event_name, context, http_response=None, **kwargs):
+  status = getattr(http_response, "status_code", 200)
+  _record_call(event_name, context, "ok" if status < 400 else "error")
+
+def _after_call_error(event_name, context, **kwargs):
+  _record_call(event_name, context, "error")
+
+def instrument_boto3(session: Optional[boto3.Session] = None) -> boto3.Session:
+  """Register the metrics hooks on a boto3 session (default session if None).
+
+  Only clients created after this call are instrumented, so call it before creating clients.
+  Registration is idempotent (hooks carry a unique_id).
+  """
+  if session is None:
+    if boto3.DEFAULT_SESSION is None:
+      boto3.setup_default_session()
+    session = boto3.DEFAULT_SESSION
+  session.events.register("before-call.*.*", _before_call, unique_id="fad-metrics-before-call")
+  session.events.register("after-call.*.*", _after_call, unique_id="fad-metrics-after-call")
+  session.events.register("after-call-error.*.*", _after_call_error, unique_id="fad-metrics-after-call-error")
+  return session
+
+class MetricsMiddleware:
+  """Pure ASGI middleware recording per-route latency.
+
+  Labels use the matched route template (e.g. /app/{app_name}) so label cardinality stays bounded.
+  """
+  def __init__(self, app):
+    self.app = app
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+    start = time.perf_counter()
+    status = {"code": 500}
+
+    async def send_wrapper(message):
+      if message["type"] == "http.response.start":
+        status["code"] = message["status"]
+      await send(message)
+
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      route = scope.get("route")
+      path = getattr(route, "path", None) or "unmatched"
+      HTTP_REQUEST_SECONDS.labels(method=scope["method"], route=path, status=str(status["code"])).observe(time.perf_counter() - start)
@@ -4,7 +4,6 @@ import json
 import os
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -49,6 +48,12 @@ class Doc(BaseModel):
   desc: Optional[str] = Field(default=None, description="Documentation description")
   url: HttpUrl = Field(..., description="Documentation URL")
 
+class JiraConfig(BaseModel):
+  project_key: str = Field(..., min_length=1, description="Jira project key holding the app's issues")
+
+class ServiceNowConfig(BaseModel):
+  cmdb_ci: str = Field(..., min_length=1, description="ServiceNow configuration item name incidents are filed against")
+
 class Environment(BaseModel):
   name: Literal["dev", "qa", "prod"] = Field(..., description="Environment name")
   host: Literal["aws"] = Field(default="aws", description="Hosting provider")
@@ -90,4 +95,165 @@ class AppConfig(BaseModel):
     return v
   source: Source
   docs: List[Doc] = Field(default_factory=list)
-  environments: List[Environment] = Field(default_factory=list)
\ No newline at end of file
+  environments: List[Environment] = Field(default_factory=list)
+  jira: Optional[JiraConfig] = None
+  servicenow: Optional[ServiceNowConfig] = None
+
+# App snapshot models (runtime view of an app assembled from AWS and ticketing sources)
+
+class Version(BaseModel):
+  number: str = Field(..., description="Deployed version number")
+  timestamp: str = Field(..., description="Version build timestamp")
+
+class Deployment(BaseModel):
+  timestamp: str = Field(..., description="Last deployment timestamp")
+  deploy_pipeline_execution_id: str = Field(..., description="Pipeline execution id of the last deployment")
+
+class DNS(BaseModel):
+  A: Optional[str] = Field(default=None, description="DNS A record")
+  details_url: Optional[HttpUrl] = Field(default=None, description="DNS details URL")
+
+class Certificate(BaseModel):
+  registrar: str = Field(..., description="Certificate registrar")
+  url: HttpUrl = Field(..., description="Certificate details URL")
+  expires: str = Field(..., description="Certificate expiry timestamp")
+  name: str = Field(..., description="Certificate common name")
+
+class AWSEnv(BaseModel):
+  account_name: str = Field(..., description="AWS account name from aws.json")
+  account_id: str = Field(..., description="AWS account id")
+  region: str = Field(..., description="AWS region")
+
+class Cost(BaseModel):
+  currency: str = Field(default="USD", description="Cost currency")
+  current_monthly_total: float = Field(..., description="Month to date cost")
+
+class LogEntry(BaseModel):
+  timestamp: str = Field(..., description="Log entry timestamp")
+  output: str = Field(..., description="Log line")
+  severity: str = Field(..., description="Log severity")
+
+class LogStream(BaseModel):
+  cloudwatch_url: HttpUrl = Field(..., description="CloudWatch log group URL")
+  recent: List[LogEntry] = Field(default_factory=list)
+
+class Logs(BaseModel):
+  http: LogStream
+  webapp: LogStream
+  db: LogStream
+
+class Uptime(BaseModel):
+  percentage: float = Field(..., description="Uptime percentage")
+  last_downtime: Optional[str] = Field(default=None, description="Last downtime timestamp")
+
+class Errors(BaseModel):
+  count: int = Field(..., description="Error count")
+  rate: float = Field(..., description="Error rate percentage")
+
+class Requests(BaseModel):
+  total: int = Field(..., description="Total requests")
+  rate_per_second: float = Field(..., description="Request rate per second")
+  errors: Errors
+
+class Latency(BaseModel):
+  avg_ms: float = Field(..., description="Average latency in ms")
+  p95_ms: float = Field(..., description="95th percentile latency in ms")
+  p99_ms: float = Field(..., description="99th percentile latency in ms")
+
+class ResourceUsage(BaseModel):
+  cpu_percent: float = Field(..., description="CPU utilization percentage")
+  memory_mb: float = Field(..., description="Memory usage in MB")
+  disk_gb: float = Field(..., description="Disk usage in GB")
+
+class Metrics(BaseModel):
+  uptime: Uptime
+  requests: Requests
+  latency: Latency
+  resource_usage: ResourceUsage
+
+class Vulnerability(BaseModel):
+  id: str = Field(..., description="Vulnerability id (e.g. CVE)")
+  severity: str = Field(..., description="Vulnerability severity")
+  description: str = Field(..., description="Vulnerability description")
+  reported: str = Field(..., description="Reported timestamp")
+
+class Vulnerabilities(BaseModel):
+  open: int = Field(default=0, description="Open vulnerability count")
+  critical: int = Field(default=0, description="Critical vulnerability count")
+  latest: List[Vulnerability] = Field(default_factory=list)
+  scanned: bool = Field(default=True, description="False when no scan result is available (counts are unknown)")
+
+class Security(BaseModel):
+  vulnerabilities: Vulnerabilities
+
+class SnapshotEnvironment(BaseModel):
+  env: str = Field(..., description="Environment name")
+  url: HttpUrl = Field(..., description="Environment app URL")
+  status: str = Field(..., description="Environment status")
+  health: str = Field(..., description="Environment health")
+  version: Version
+  host: str = Field(default="aws", description="Hosting provider")
+  git_branch: str = Field(..., description="Deployed git branch")
+  app_profile: str = Field(..., description="App profile from app_profiles.json")
+  deploy_profile: str = Field(..., description="Deploy profile from app_deploy_profiles.json")
+  deploy_pipeline_name: str = Field(..., description="Pipeline name")
+  deployment: Deployment
+  dns: DNS
+  certificate: Certificate
+  aws: AWSEnv
+  cost: Cost
+  logs: Logs
+  metrics: Metrics
+  security: Security
+
+class Commit(BaseModel):
+  id: str = Field(..., description="Commit id")
+  message: str = Field(..., description="Commit message")
+  timestamp: str = Field(..., description="Commit timestamp")
+  branch: str = Field(..., description="Commit branch")
+
+class SnapshotSource(BaseModel):
+  git_origin: str = Field(..., description="Git repository URL")
+  latest_commits: List[Commit] = Field(default_factory=list)
+
+class JiraTicket(BaseModel):
+  id: str = Field(..., description="Jira issue key")
+  title: str = Field(..., description="Issue summary")
+  description: Optional[str] = Field(default=None, description="Issue description")
+  status: str = Field(..., description="Issue status")
+  created: str = Field(..., description="Created timestamp")
+
+class JiraTickets(BaseModel):
+  open: int = Field(default=0, description="Open issue count")
+  latest: List[JiraTicket] = Field(default_factory=list)
+
+class Jira(BaseModel):
+  url: HttpUrl = Field(..., description="Jira base URL")
+  tickets: JiraTickets
+
+class ServiceNowTicket(BaseModel):
+  id: str = Field(..., description="ServiceNow ticket number")
+  title: str = Field(..., description="Ticket short description")
+  description: Optional[str] = Field(default=None, description="Ticket description")
+  created: str = Field(..., description="Created timestamp")
+  impact: str = Field(..., description="Ticket impact")
+  approvers: List[str] = Field(default_factory=list)
+
+class ServiceNow(BaseModel):
+  open: int = Field(default=0, description="Open ticket count")
+  overdue: int = Field(default=0, description="Overdue ticket count")
+  tickets: List[ServiceNowTicket] = Field(default_factory=list)
+
+class SnapshotApp(BaseModel):
+  name: str = Field(..., min_length=1, description="Unique app name")
+  desc: str = Field(..., description="App description")
+  environments: List[SnapshotEnvironment] = Field(default_factory=list)
+  source: SnapshotSource
+  docs: List[Doc] = Field(default_factory=list)
+  jira: Jira
+  servicenow: ServiceNow
+
+class AppSnapshot(BaseModel):
+  app_snapshot_id: str = Field(..., description="Snapshot id")
+  app_snapshot_timestamp: str = Field(..., description="Snapshot timestamp")
+  app: SnapshotApp
@@ -0,0 +1,76 @@
+# app/profiler.py
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# Bounds for the sampling interval: faster than 1ms walks every stack in a near busy loop
+MIN_INTERVAL = 0.001
+MAX_INTERVAL = 1.0
+
+class SamplingProfiler:
+  """Low overhead wall-clock sampling profiler.
+
+  A daemon thread snapshots every thread's stack at a fixed interval and counts
+  collapsed stacks ("frame;frame;frame count"), the input format of flamegraph.pl
+  and speedscope. Off by default; started and stopped at runtime.
+  """
+  def __init__(self, interval: float = 0.01, max_depth: int = 64):
+    self.interval = interval
+    self.max_depth = max_depth
+    self.samples: Counter = Counter()
+    self.started_at: Optional[float] = None
+    self._stop = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+    self._lock = threading.Lock()
+    self._samples_lock = threading.Lock()
+
+  @property
+  def running(self) -> bool:
+    return self._thread is not None and self._thread.is_alive()
+
+  def start(self, interval: Optional[float] = None):
+    if interval is not None and not MIN_INTERVAL <= interval <= MAX_INTERVAL:
+      raise ValueError(f"interval must be between {MIN_INTERVAL} and {MAX_INTERVAL} seconds")
+    with self._lock:
+      if self.running:
+        return
+      if interval is not None:
+        self.interval = interval
+      with self._samples_lock:
+        self.samples.clear()
+      self.started_at = time.time()
+      self._stop.clear()
+      self._thread = threading.Thread(target=self._run, name="fad-profiler", daemon=True)
+      self._thread.start()
+
+  def stop(self):
+    with self._lock:
+      if not self.running:
+        return
+      self._stop.set()
+      self._thread.join()
+      self._thread = None
+
+  def _run(self):
+    own_ident = threading.get_ident()
+    while not self._stop.wait(self.interval):
+      for ident, frame in sys._current_frames().items():
+        if ident == own_ident:
+          continue
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+          code = frame.f_code
+          stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+          frame = frame.f_back
+        with self._samples_lock:
+          self.samples[";".join(reversed(stack))] += 1
+
+  def collapsed(self) -> str:
+    """Return the collected samples in collapsed stack format, hottest first."""
+    with self._samples_lock:
+      samples = self.samples.most_common()
+    return "\n".join(f"{stack} {count}" for stack, count in samples)
+
+PROFILER = SamplingProfiler()
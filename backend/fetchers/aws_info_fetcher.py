@@ -1,7 +1,13 @@
 import boto3
 import json
+import logging
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from app.log import log_context, setup_logging
+from app.metrics import instrument_boto3
+from fetchers.fetch import CLIENT_CONFIG, EXECUTOR, PartialResult
+
+logger = logging.getLogger(__name__)
 
 class CICDInfo(BaseModel):
   arn: Optional[str] = ""
@@ -44,43 +50,55 @@ class AWSInfo(BaseModel):
   alb: ALBInfo
   s3: S3Info
   cloudwatch_log_groups: List[CloudWatchLogGroup] = []
+  stale_fields: List[str] = []
+
+setup_logging()
+instrument_boto3()
 
 aws_region = boto3.Session().region_name
-sts_client = boto3.client('sts')
-aws_account_id = sts_client.get_caller_identity()['Account']
-
-codecommit = boto3.client('codecommit')
-pipelines = boto3.client('codepipeline')
-route53 = boto3.client('route53')
-acm = boto3.client('acm')
-rds = boto3.client('rds')
-ecs = boto3.client('ecs')
-elbv2 = boto3.client('elbv2')
-s3 = boto3.client('s3')
-logs = boto3.client('logs')
-
-# Fetch data
-def safe_fetch(fn, default=None):
-  try:
-    return fn()
-  except Exception:
-    return default
-
-codecommit_repos = safe_fetch(lambda: codecommit.list_repositories()['repositories'][0]['repositoryName'], "")
-pipeline_arn = safe_fetch(lambda: pipelines.list_pipelines()['pipelines'][0]['name'], "")
-pipeline_status = safe_fetch(lambda: pipelines.get_pipeline_state(name=pipeline_arn)['stageStates'][0]['latestExecution']['status'], "")
-last_deployment = safe_fetch(lambda: pipelines.list_pipeline_executions(pipeline_name=pipeline_arn)['pipelineExecutionSummaries'][0]['lastUpdateTime'], "")
-hosted_zone = safe_fetch(lambda: route53.list_hosted_zones()['HostedZones'][0]['Id'], "")
-tls_cert_arn = safe_fetch(lambda: acm.list_certificates()['CertificateSummaryList'][0]['CertificateArn'], "")
-rds_arn = safe_fetch(lambda: rds.describe_db_instances()['DBInstances'][0]['DBInstanceArn'], "")
-
-ecs_clusters = safe_fetch(lambda: ecs.list_clusters()['clusterArns'][0], "")
-ecs_services = safe_fetch(lambda: ecs.list_services(cluster=ecs_clusters)['serviceArns'][0], "")
-task_definition_arn = safe_fetch(lambda: ecs.describe_services(cluster=ecs_clusters, services=[ecs_services])['services'][0]['taskDefinition'], "")
-
-alb_arn = safe_fetch(lambda: elbv2.describe_load_balancers()['LoadBalancers'][0]['LoadBalancerArn'], "")
-s3_buckets = safe_fetch(lambda: [f"arn:aws:s3:::{b['Name']}" for b in s3.list_buckets()['Buckets']], [])
-log_groups = safe_fetch(lambda: [{"name": lg['logGroupName'], "url": f"https://console.aws.amazon.com/cloudwatch/home?region={aws_region}#logStream:group={lg['logGroupName']}"} for lg in logs.describe_log_groups()['logGroups']], [])
+aws_account_id = EXECUTOR.account_id()
+
+codecommit = boto3.client('codecommit', config=CLIENT_CONFIG)
+pipelines = boto3.client('codepipeline', config=CLIENT_CONFIG)
+route53 = boto3.client('route53', config=CLIENT_CONFIG)
+acm = boto3.client('acm', config=CLIENT_CONFIG)
+rds = boto3.client('rds', config=CLIENT_CONFIG)
+ecs = boto3.client('ecs', config=CLIENT_CONFIG)
+elbv2 = boto3.client('elbv2', config=CLIENT_CONFIG)
+s3 = boto3.client('s3', config=CLIENT_CONFIG)
+logs = boto3.client('logs', config=CLIENT_CONFIG)
+
+# Fetch data - API errors (after retries) mark the field stale; an absent resource just yields the default
+result = PartialResult()
+
+def call(client, operation, **params):
+  with log_context(account=aws_account_id):
+    return EXECUTOR.call(client, operation, account=aws_account_id, **params)
+
+def safe_fetch(name, fn, default=None):
+  def fetch():
+    try:
+      return fn()
+    except (IndexError, KeyError):
+      return default
+  with log_context(account=aws_account_id):
+    return result.field(name, fetch, default)
+
+codecommit_repos = safe_fetch("codecommit_project_url", lambda: call(codecommit, 'list_repositories')['repositories'][0]['repositoryName'], "")
+pipeline_arn = safe_fetch("cicd.arn", lambda: call(pipelines, 'list_pipelines')['pipelines'][0]['name'], "")
+pipeline_status = safe_fetch("cicd.pipeline_status", lambda: call(pipelines, 'get_pipeline_state', name=pipeline_arn)['stageStates'][0]['latestExecution']['status'], "")
+last_deployment = safe_fetch("cicd.last_deployment_timestamp", lambda: call(pipelines, 'list_pipeline_executions', pipeline_name=pipeline_arn)['pipelineExecutionSummaries'][0]['lastUpdateTime'], "")
+hosted_zone = safe_fetch("route53.hostedZone", lambda: call(route53, 'list_hosted_zones')['HostedZones'][0]['Id'], "")
+tls_cert_arn = safe_fetch("certificatemgr.tls_http_arn", lambda: call(acm, 'list_certificates')['CertificateSummaryList'][0]['CertificateArn'], "")
+rds_arn = safe_fetch("dbs.rds", lambda: call(rds, 'describe_db_instances')['DBInstances'][0]['DBInstanceArn'], "")
+
+ecs_clusters = safe_fetch("ecs.cluster_arn", lambda: call(ecs, 'list_clusters')['clusterArns'][0], "")
+ecs_services = safe_fetch("ecs.service_name", lambda: call(ecs, 'list_services', cluster=ecs_clusters)['serviceArns'][0], "")
+task_definition_arn = safe_fetch("ecs.task_definition_arn", lambda: call(ecs, 'describe_services', cluster=ecs_clusters, services=[ecs_services])['services'][0]['taskDefinition'], "")
+
+alb_arn = safe_fetch("alb.alb_arn", lambda: call(elbv2, 'describe_load_balancers')['LoadBalancers'][0]['LoadBalancerArn'], "")
+s3_buckets = safe_fetch("s3.referenced_bucket_arns", lambda: [f"arn:aws:s3:::{b['Name']}" for b in call(s3, 'list_buckets')['Buckets']], [])
+log_groups = safe_fetch("cloudwatch_log_groups", lambda: [{"name": lg['logGroupName'], "url": f"https://console.aws.amazon.com/cloudwatch/home?region={aws_region}#logStream:group={lg['logGroupName']}"} for lg in call(logs, 'describe_log_groups')['logGroups']], [])
 
 # Construct JSON output
 aws_info = AWSInfo(
@@ -102,7 +120,8 @@ aws_info = AWSInfo(
   ),
   alb=ALBInfo(alb_arn=alb_arn),
   s3=S3Info(referenced_bucket_arns=s3_buckets),
-  cloudwatch_log_groups=[CloudWatchLogGroup(**lg) for lg in log_groups]
+  cloudwatch_log_groups=[CloudWatchLogGroup(**lg) for lg in log_groups],
+  stale_fields=result.stale_fields
 )
 
 print(aws_info.json(indent=2))
@@ -0,0 +1,117 @@
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+
+import boto3
+from app import metrics
+from app.models import AppConfig
+from fetchers.fetch import CLIENT_CONFIG, EXECUTOR
+from fetchers.ingest import HttpClient, IngestSource
+
+logger = logging.getLogger(__name__)
+
+COMMITS_PER_BRANCH = 5
+LATEST_COUNT = 10
+
+def branches(config: AppConfig) -> List[str]:
+    """Branches deployed by any environment of the app, in config order."""
+    return list(dict.fromkeys(env.git_branch for env in config.environments))
+
+def latest(commits: List[dict]) -> List[dict]:
+    return sorted(commits, key=lambda c: c["timestamp"], reverse=True)[:LATEST_COUNT]
+
+class CodeCommitSource(IngestSource):
+    """Latest commits of every deployed branch for apps hosted in CodeCommit.
+
+    The branch head is checked first (one GetBranch call); an unchanged head reuses
+    the cached commits, and a moved head only walks back to the first commit already seen.
+    """
+    name = "codecommit"
+    section = "source.latest_commits"
+
+    def __init__(self, client=None):
+        self.client = client or boto3.client("codecommit", config=CLIENT_CONFIG)
+        self.heads: Dict[Tuple[str, str], str] = {}
+        self.commits: Dict[Tuple[str, str], List[dict]] = {}
+
+    @staticmethod
+    def repository(config: AppConfig) -> str:
+        return urlparse(str(config.source.git_origin_url)).path.strip("/").split("/")[-1]
+
+    def branch_commits(self, repository: str, branch: str) -> List[dict]:
+        key = (repository, branch)
+        head = EXECUTOR.call(self.client, "get_branch", repositoryName=repository, branchName=branch)["branch"]["commitId"]
+        metrics.record_cache(self.name, self.heads.get(key) == head)
+        if self.heads.get(key) == head:
+            return self.commits[key]
+        known = {c["id"] for c in self.commits.get(key, [])}
+        fresh, commit_id = [], head
+        while commit_id and commit_id not in known and len(fresh) < COMMITS_PER_BRANCH:
+            commit = EXECUTOR.call(self.client, "get_commit", repositoryName=repository, commitId=commit_id)["commit"]
+            epoch = int(commit["committer"]["date"].split()[0])
+            fresh.append({
+                "id": commit_id,
+                "message": (commit.get("message") or "").strip().split("\n")[0],
+                "timestamp": datetime.fromtimestamp(epoch, timezone.utc).isoformat(),
+                "branch": branch,
+            })
+            commit_id = (commit.get("parents") or [None])[0]
+        self.heads[key] = head
+        self.commits[key] = (fresh + self.commits.get(key, []))[:COMMITS_PER_BRANCH]
+        return self.commits[key]
+
+    def fetch(self, configs: List[AppConfig]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        for config in configs:
+            if "codecommit" not in (urlparse(str(config.source.git_origin_url)).hostname or ""):
+                continue
+            repository = self.repository(config)
+            results[config.app_name] = latest([c for b in branches(config) for c in self.branch_commits(repository, b)])
+        return results
+
+class GitHubSource(IngestSource):
+    """Latest commits of every deployed branch for apps hosted on GitHub (or GitHub Enterprise).
+
+    Uses conditional requests, so an unchanged branch costs a 304 that does not count
+    against the API rate limit.
+    """
+    name = "github"
+    section = "source.latest_commits"
+
+    def __init__(self, client: HttpClient, host: str = "github.com"):
+        self.client = client
+        self.host = host
+
+    def fetch(self, configs: List[AppConfig]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        for config in configs:
+            url = urlparse(str(config.source.git_origin_url))
+            if url.hostname != self.host:
+                continue
+            owner, repo = url.path.strip("/").removesuffix(".git").split("/")[:2]
+            commits = []
+            for branch in branches(config):
+                for c in self.client.get_json(f"/repos/{owner}/{repo}/commits", {"sha": branch, "per_page": COMMITS_PER_BRANCH}):
+                    commits.append({
+                        "id": c["sha"],
+                        "message": (c["commit"]["message"] or "").strip().split("\n")[0],
+                        "timestamp": c["commit"]["committer"]["date"],
+                        "branch": branch,
+                    })
+            results[config.app_name] = latest(commits)
+        return results
+
+def build_commit_sources() -> List[IngestSource]:
+    """CodeCommit is enabled by FAD_INGEST_CODECOMMIT=1, GitHub by FAD_GITHUB_TOKEN
+    (FAD_GITHUB_API_URL / FAD_GITHUB_HOST for GitHub Enterprise or a local stand-in)."""
+    sources: List[IngestSource] = []
+    if os.environ.get("FAD_INGEST_CODECOMMIT") == "1":
+        sources.append(CodeCommitSource())
+    if os.environ.get("FAD_GITHUB_TOKEN"):
+        sources.append(GitHubSource(
+            HttpClient(os.environ.get("FAD_GITHUB_API_URL", "https://api.github.com"), "github", token=os.environ["FAD_GITHUB_TOKEN"]),
+            host=os.environ.get("FAD_GITHUB_HOST", "github.com"),
+        ))
+    return sources
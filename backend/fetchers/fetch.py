@@ -0,0 +1,233 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionClosedError, EndpointConnectionError, ReadTimeoutError
+from app import metrics
+from app.log import log_context
+
+logger = logging.getLogger(__name__)
+
+# Retries are owned by FetchExecutor, so botocore must not retry underneath it
+CLIENT_CONFIG = Config(retries={"mode": "standard", "max_attempts": 1})
+
+THROTTLE_CODES = {
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottledException",
+    "TooManyRequestsException", "ProvisionedThroughputExceededException", "TransactionInProgressException",
+    "RequestLimitExceeded", "BandwidthLimitExceeded", "LimitExceededException", "RequestThrottled",
+    "SlowDown", "PriorRequestNotComplete", "EC2ThrottledException",
+}
+TRANSIENT_CODES = {"RequestTimeout", "RequestTimeoutException", "InternalError", "InternalFailure", "ServiceUnavailable"}
+TRANSIENT_EXCEPTIONS = (EndpointConnectionError, ConnectionClosedError, ReadTimeoutError)
+
+# Steady state calls/sec per API; AWS control plane APIs commonly allow a few tps per account and region
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10.0
+API_RATES: Dict[str, Tuple[float, float]] = {
+    "codepipeline": (2.0, 5.0),
+    "codedeploy": (5.0, 10.0),
+    "elbv2": (10.0, 20.0),
+    "ecs": (20.0, 40.0),
+    "logs": (5.0, 10.0),
+    "route53": (5.0, 5.0),
+}
+
+def error_code(exc: Exception) -> Optional[str]:
+    if isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code")
+    return None
+
+def is_throttle(exc: Exception) -> bool:
+    if isinstance(exc, ClientError):
+        status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        return error_code(exc) in THROTTLE_CODES or status == 429
+    return False
+
+def is_retryable(exc: Exception) -> bool:
+    if is_throttle(exc) or isinstance(exc, TRANSIENT_EXCEPTIONS):
+        return True
+    if isinstance(exc, ClientError):
+        status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        return error_code(exc) in TRANSIENT_CODES or status >= 500
+    return False
+
+class TokenBucket:
+    """Adaptive token bucket (AIMD).
+
+    Throttles cut the rate in half (down to `min_rate`); every success creeps it
+    back up toward `max_rate`, so a sweep settles just under what AWS allows.
+    """
+    def __init__(self, rate: float, burst: float, min_rate: float = 0.2):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+class RetryBudget:
+    """Caps retries to a fraction of successful calls so a struggling API is not hammered.
+
+    Each success deposits `ratio` tokens and each retry withdraws one; `min_retries`
+    per second are always allowed so a cold budget can still recover.
+    """
+    def __init__(self, ratio: float = 0.2, min_retries: float = 1.0, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.max_tokens, self.tokens + (now - self.updated) * self.min_retries)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class FetchExecutor:
+    """Runs AWS API calls through per (account, region, service) rate limiters and retry budgets.
+
+    Retries use full-jitter exponential backoff; throttling errors also slow the limiter
+    for everyone sharing that account/region/service. Thread safe, so one executor can
+    back a whole concurrent sweep. Calls without an explicit `account` are keyed by the
+    account of the default credentials, resolved once with STS.
+    """
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.2, max_delay: float = 20.0,
+                 api_rates: Optional[Dict[str, Tuple[float, float]]] = None, sleep: Callable[[float], None] = time.sleep):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.api_rates = {**API_RATES, **(api_rates or {})}
+        self.sleep = sleep
+        self._buckets: Dict[tuple, TokenBucket] = {}
+        self._budgets: Dict[tuple, RetryBudget] = {}
+        self._lock = threading.Lock()
+        self._account: Optional[str] = None
+        self._account_lock = threading.Lock()
+
+    def account_id(self) -> str:
+        """Account id of the default boto3 credentials (STS GetCallerIdentity, cached). Raises on failure."""
+        with self._account_lock:
+            if self._account is None:
+                sts = boto3.client("sts", config=CLIENT_CONFIG)
+                self._account = sts.get_caller_identity()["Account"]
+            return self._account
+
+    def default_account(self) -> str:
+        try:
+            return self.account_id()
+        except Exception as e:
+            # the call itself will surface the credentials problem; retried on the next call
+            logger.warning("Could not resolve the AWS account id: %s", e)
+            return "default"
+
+    def limiter(self, account: str, region: str, service: str) -> Tuple[TokenBucket, RetryBudget]:
+        key = (account, region, service)
+        with self._lock:
+            if key not in self._buckets:
+                rate, burst = self.api_rates.get(service, (DEFAULT_RATE, DEFAULT_BURST))
+                self._buckets[key] = TokenBucket(rate, burst)
+                self._budgets[key] = RetryBudget()
+            return self._buckets[key], self._budgets[key]
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, client, operation: str, account: Optional[str] = None, **params) -> Any:
+        """Call `client.<operation>(**params)`, e.g. call(ecs, "list_clusters"). Raises the last error."""
+        service = client.meta.service_model.service_name
+        account = account or self.default_account()
+        bucket, budget = self.limiter(account, client.meta.region_name or "", service)
+        method = getattr(client, operation)
+        # metric labels match the botocore event names the instrument_boto3 hooks use ("elastic-load-balancing-v2", "DescribeLoadBalancers")
+        label = {"service": client.meta.service_model.service_id.hyphenize(), "operation": client.meta.method_to_api_mapping.get(operation, operation)}
+        attempt = 0
+        with log_context(account=account):
+            while True:
+                bucket.acquire()
+                try:
+                    response = method(**params)
+                except Exception as e:
+                    throttled = is_throttle(e)
+                    if throttled:
+                        bucket.on_throttle()
+                        metrics.AWS_THROTTLES.labels(**label).inc()
+                    attempt += 1
+                    if not is_retryable(e) or attempt >= self.max_attempts:
+                        raise
+                    if not budget.withdraw():
+                        metrics.AWS_RETRY_BUDGET_EXHAUSTED.labels(service=label["service"]).inc()
+                        logger.warning("Retry budget exhausted for %s.%s", service, operation)
+                        raise
+                    delay = self.backoff(attempt)
+                    metrics.AWS_RETRIES.labels(**label).inc()
+                    logger.debug("Retrying %s.%s in %.2fs (attempt %d, throttled=%s): %s", service, operation, delay, attempt, throttled, e)
+                    self.sleep(delay)
+                    continue
+                bucket.on_success()
+                budget.deposit()
+                return response
+
+class PartialResult:
+    """Collects the fields of one fetch. A field that fails keeps its previous value
+    (or the default when there is none) and is listed in `stale_fields` instead of
+    silently turning blank.
+    """
+    def __init__(self, previous: Optional[Dict[str, Any]] = None):
+        self.previous = previous or {}
+        self.values: Dict[str, Any] = {}
+        self.stale_fields: List[str] = []
+        self.errors: Dict[str, str] = {}
+
+    def field(self, name: str, fn: Callable[[], Any], default: Any = None) -> Any:
+        try:
+            value = fn()
+        except Exception as e:
+            value = self.previous.get(name, default)
+            self.stale_fields.append(name)
+            self.errors[name] = error_code(e) or type(e).__name__
+            logger.warning("Fetch of %s failed, keeping previous value: %s", name, e)
+        self.values[name] = value
+        return value
+
+EXECUTOR = FetchExecutor()
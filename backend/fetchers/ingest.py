@@ -0,0 +1,155 @@
+import base64
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app import metrics
+from app.log import log_context
+from app.models import AppConfig
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ORG_PATH = os.path.join(BASE_DIR, "../model/org.json")
+
+def load_org() -> dict:
+    try:
+        with open(ORG_PATH, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning("%s not found, ticket sources need explicit base URLs", ORG_PATH)
+        return {}
+
+class HttpClient:
+    """Minimal JSON-over-HTTP client with conditional requests.
+
+    Every GET remembers the ETag / Last-Modified of its URL; the next GET for the same
+    URL sends If-None-Match / If-Modified-Since and a 304 returns the cached body
+    without re-downloading or re-parsing it. Hits and misses go to /metrics under `cache_name`.
+    Only the `max_entries` most recently used URLs are kept; pass cache=False for URLs
+    that never repeat (e.g. incremental queries).
+    """
+    def __init__(self, base_url: str, cache_name: str, username: Optional[str] = None, password: Optional[str] = None,
+                 token: Optional[str] = None, timeout: float = 30.0, max_entries: int = 256):
+        self.base_url = base_url.rstrip("/")
+        self.cache_name = cache_name
+        self.timeout = timeout
+        self.headers = {"Accept": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+        elif username and password:
+            self.headers["Authorization"] = "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
+        self.max_entries = max_entries
+        self._cache: Dict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def url(self, path: str, params: Optional[dict] = None) -> str:
+        query = f"?{urllib.parse.urlencode(params)}" if params else ""
+        return f"{self.base_url}{path}{query}"
+
+    def get_json(self, path: str, params: Optional[dict] = None, cache: bool = True) -> Any:
+        url = self.url(path, params)
+        headers = dict(self.headers)
+        with self._lock:
+            cached = self._cache.get(url) if cache else None
+            if cached:
+                self._cache.move_to_end(url)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = json.loads(response.read() or b"null")
+                etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                metrics.record_cache(self.cache_name, True)
+                return cached[2]
+            raise
+        if not cache:
+            return body
+        metrics.record_cache(self.cache_name, False)
+        if etag or last_modified:
+            with self._lock:
+                self._cache[url] = (etag, last_modified, body)
+                self._cache.move_to_end(url)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return body
+
+class IngestSource:
+    """A bulk source of per-app snapshot data (tickets, commits, ...).
+
+    `fetch` is called once per refresh with every app config and returns
+    {app_name: value} for the apps it covers; `section` is the dotted path in the
+    snapshot's "app" block the value replaces (see apply_ingested). Sources keep their own caches and
+    incremental cursors between calls.
+    """
+    name = "source"
+    section = ""
+
+    def fetch(self, configs: List[AppConfig]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+class Ingestor:
+    """Runs every enabled source once per refresh. A failing source serves its last good result."""
+    def __init__(self, sources: List[IngestSource]):
+        self.sources = sources
+        self.last_good: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, configs: List[AppConfig]) -> Dict[str, Dict[str, Any]]:
+        """Return {section: {app_name: value}}."""
+        results: Dict[str, Dict[str, Any]] = {}
+        for source in self.sources:
+            start = time.perf_counter()
+            with log_context(source=source.name):
+                try:
+                    self.last_good[source.name] = source.fetch(configs)
+                except Exception:
+                    metrics.INGEST_FAILURES.labels(source=source.name).inc()
+                    logger.exception("Ingestion failed, keeping last good result")
+                finally:
+                    metrics.INGEST_SECONDS.labels(source=source.name).observe(time.perf_counter() - start)
+            results.setdefault(source.section, {}).update(self.last_good.get(source.name, {}))
+        return results
+
+def apply_ingested(snapshot_data: dict, app_name: str, ingested: Optional[Dict[str, Dict[str, Any]]]) -> dict:
+    """Replace snapshot "app" sections with ingested values for this app, where a source had any.
+
+    A section "environments.<field>" holds {env name: value} and replaces that field per environment.
+    """
+    for section, values in (ingested or {}).items():
+        if app_name not in values:
+            continue
+        if section.startswith("environments."):
+            # per-environment sections map {env name: value} onto each environment entry
+            field = section.split(".", 1)[1]
+            for env in snapshot_data["app"]["environments"]:
+                if env["env"] in values[app_name]:
+                    env[field] = values[app_name][env["env"]]
+            continue
+        target = snapshot_data["app"]
+        *parents, leaf = section.split(".")
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = values[app_name]
+    return snapshot_data
+
+def build_ingestor() -> Ingestor:
+    """Ingestor over every source whose credentials/flags are configured in the environment."""
+    from fetchers.commit_fetcher import build_commit_sources
+    from fetchers.ticket_fetcher import build_ticket_sources
+    from fetchers.vuln_fetcher import build_vulnerability_sources
+    org = load_org()
+    return Ingestor(build_ticket_sources(org) + build_commit_sources() + build_vulnerability_sources())
@@ -0,0 +1,254 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.models import AppConfig
+from fetchers.ingest import HttpClient, IngestSource
+
+logger = logging.getLogger(__name__)
+
+LATEST_COUNT = 5
+# ServiceNow's default incident impact choices (raw value -> label)
+SERVICENOW_IMPACT = {"1": "1 - High", "2": "2 - Medium", "3": "3 - Low"}
+# Re-read a little before the previous run so clock skew and in-flight updates are not missed
+CURSOR_OVERLAP_MINUTES = 5
+INITIAL_WINDOW_DAYS = 30
+
+class IncrementalCursor:
+    """Minutes elapsed since the last successful run, for relative ("updated in the last N
+    minutes") queries. Relative queries sidestep the server-side user time zone that
+    absolute JQL / ServiceNow dates are interpreted in. Their URLs change every run, so
+    they are fetched without the HttpClient's conditional request cache.
+    """
+    def __init__(self):
+        self.last_run: Optional[float] = None
+        self.keys: Optional[frozenset] = None
+
+    def minutes(self) -> Optional[int]:
+        if self.last_run is None:
+            return None
+        return int((time.time() - self.last_run) // 60) + CURSOR_OVERLAP_MINUTES
+
+    def advance(self, started_at: float):
+        self.last_run = started_at
+
+    def scope(self, keys):
+        """Restart with a full load when the set of queried projects / CIs changes."""
+        keys = frozenset(keys)
+        if keys != self.keys:
+            self.keys, self.last_run = keys, None
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%d %H:%M:%S"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+def adf_text(value: Any) -> Optional[str]:
+    """Plain text of an Atlassian Document Format field (Jira Cloud REST v3); strings pass through."""
+    if value is None or isinstance(value, str):
+        return value
+    parts: List[str] = []
+
+    def walk(node):
+        if node.get("type") == "text":
+            parts.append(node.get("text", ""))
+        for child in node.get("content", []):
+            walk(child)
+        if node.get("type") in ("paragraph", "heading", "listItem"):
+            parts.append("\n")
+    walk(value)
+    return "".join(parts).strip()
+
+class JiraSource(IngestSource):
+    """Open issues for every app in one JQL search (`project in (...)`), paginated.
+
+    The first run loads open issues plus anything updated in the last 30 days; later
+    runs only ask for issues updated since the previous run and merge them into the cache.
+    Jira Cloud is searched with /rest/api/3/search/jql (token paginated); Data Center,
+    which does not have it, with the offset paginated /rest/api/2/search.
+    """
+    name = "jira"
+    section = "jira"
+    fields = "summary,description,status,created,updated,project"
+
+    def __init__(self, client: HttpClient, page_size: int = 100, cloud: bool = True):
+        self.client = client
+        self.page_size = page_size
+        self.cloud = cloud
+        self.cursor = IncrementalCursor()
+        self.issues: Dict[str, dict] = {}
+
+    def jql(self, project_keys: List[str]) -> str:
+        projects = ", ".join(f'"{key}"' for key in sorted(project_keys))
+        minutes = self.cursor.minutes()
+        if minutes is None:
+            window = f"(statusCategory != Done OR updated >= -{INITIAL_WINDOW_DAYS}d)"
+        else:
+            window = f"updated >= -{minutes}m"
+        return f"project in ({projects}) AND {window} ORDER BY updated DESC"
+
+    def search(self, jql: str) -> List[dict]:
+        if self.cloud:
+            return self.search_cloud(jql)
+        issues, start_at = [], 0
+        while True:
+            page = self.client.get_json("/rest/api/2/search", {
+                "jql": jql, "startAt": start_at, "maxResults": self.page_size, "fields": self.fields,
+            }, cache=False)
+            issues.extend(page.get("issues", []))
+            start_at += len(page.get("issues", []))
+            if not page.get("issues") or start_at >= page.get("total", 0):
+                return issues
+
+    def search_cloud(self, jql: str) -> List[dict]:
+        issues, token = [], None
+        while True:
+            params = {"jql": jql, "maxResults": self.page_size, "fields": self.fields}
+            if token:
+                params["nextPageToken"] = token
+            page = self.client.get_json("/rest/api/3/search/jql", params, cache=False)
+            issues.extend(page.get("issues", []))
+            token = page.get("nextPageToken")
+            if not token or page.get("isLast"):
+                return issues
+
+    def fetch(self, configs: List[AppConfig]) -> Dict[str, Any]:
+        apps_by_project = {c.jira.project_key: c.app_name for c in configs if c.jira}
+        if not apps_by_project:
+            return {}
+        started_at = time.time()
+        self.cursor.scope(apps_by_project)
+        for issue in self.search(self.jql(list(apps_by_project))):
+            self.issues[issue["key"]] = issue
+        self.cursor.advance(started_at)
+        self.prune()
+
+        results: Dict[str, Any] = {}
+        for project_key, app_name in apps_by_project.items():
+            issues = [i for i in self.issues.values() if i["fields"]["project"]["key"] == project_key]
+            open_issues = [i for i in issues if not self.is_done(i)]
+            latest = sorted(open_issues, key=lambda i: i["fields"].get("created") or "", reverse=True)[:LATEST_COUNT]
+            results[app_name] = {
+                "url": self.client.base_url,
+                "tickets": {
+                    "open": len(open_issues),
+                    "latest": [{
+                        "id": i["key"],
+                        "title": i["fields"].get("summary") or "",
+                        "description": adf_text(i["fields"].get("description")),
+                        "status": i["fields"]["status"]["name"],
+                        "created": i["fields"].get("created") or "",
+                    } for i in latest],
+                },
+            }
+        return results
+
+    @staticmethod
+    def is_done(issue: dict) -> bool:
+        return issue["fields"]["status"].get("statusCategory", {}).get("key") == "done"
+
+    def prune(self):
+        """Drop resolved issues once they age out of the initial window."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=INITIAL_WINDOW_DAYS)
+        for key, issue in list(self.issues.items()):
+            updated = parse_time(issue["fields"].get("updated"))
+            if self.is_done(issue) and (updated is None or updated < cutoff):
+                del self.issues[key]
+
+class ServiceNowSource(IngestSource):
+    """Active incidents for every app's configuration item in one Table API query.
+
+    The first run loads all active incidents; later runs fetch incidents updated since
+    the previous run (including ones that were just closed, which are dropped). Raw
+    values are requested: display values are in the integration user's date format and time zone.
+    """
+    name = "servicenow"
+    section = "servicenow"
+    fields = "number,short_description,description,opened_at,impact,active,due_date,cmdb_ci.name,sys_updated_on"
+
+    def __init__(self, client: HttpClient, page_size: int = 200):
+        self.client = client
+        self.page_size = page_size
+        self.cursor = IncrementalCursor()
+        self.incidents: Dict[str, dict] = {}
+
+    def query(self, ci_names: List[str]) -> str:
+        cis = ",".join(sorted(ci_names))
+        minutes = self.cursor.minutes()
+        if minutes is None:
+            return f"cmdb_ci.nameIN{cis}^active=true"
+        return f"cmdb_ci.nameIN{cis}^sys_updated_onRELATIVEGE@minute@ago@{minutes}"
+
+    def records(self, query: str) -> List[dict]:
+        records, offset = [], 0
+        while True:
+            page = self.client.get_json("/api/now/table/incident", {
+                "sysparm_query": query, "sysparm_fields": self.fields,
+                "sysparm_limit": self.page_size, "sysparm_offset": offset,
+                "sysparm_display_value": "false", "sysparm_exclude_reference_link": "true",
+            }, cache=False).get("result", [])
+            records.extend(page)
+            offset += len(page)
+            if len(page) < self.page_size:
+                return records
+
+    def fetch(self, configs: List[AppConfig]) -> Dict[str, Any]:
+        apps_by_ci = {c.servicenow.cmdb_ci: c.app_name for c in configs if c.servicenow}
+        if not apps_by_ci:
+            return {}
+        started_at = time.time()
+        self.cursor.scope(apps_by_ci)
+        for record in self.records(self.query(list(apps_by_ci))):
+            if str(record.get("active")).lower() == "true":
+                self.incidents[record["number"]] = record
+            else:
+                self.incidents.pop(record["number"], None)
+        self.cursor.advance(started_at)
+
+        now = datetime.now(timezone.utc)
+        results: Dict[str, Any] = {}
+        for ci_name, app_name in apps_by_ci.items():
+            incidents = [r for r in self.incidents.values() if r.get("cmdb_ci.name") == ci_name]
+            overdue = [r for r in incidents if (parse_time(r.get("due_date")) or now) < now]
+            latest = sorted(incidents, key=lambda r: r.get("opened_at") or "", reverse=True)[:LATEST_COUNT]
+            results[app_name] = {
+                "open": len(incidents),
+                "overdue": len(overdue),
+                "tickets": [{
+                    "id": r["number"],
+                    "title": r.get("short_description") or "",
+                    "description": r.get("description"),
+                    "created": r.get("opened_at") or "",
+                    "impact": SERVICENOW_IMPACT.get(r.get("impact"), r.get("impact") or ""),
+                    "approvers": [],
+                } for r in latest],
+            }
+        return results
+
+def build_ticket_sources(org: dict) -> List[IngestSource]:
+    """Jira is enabled by FAD_JIRA_TOKEN, ServiceNow by FAD_SERVICENOW_USER/FAD_SERVICENOW_PASSWORD.
+
+    Base URLs come from org.json (group.jira_base_url / group.servicenow_base_url)
+    unless FAD_JIRA_URL / FAD_SERVICENOW_URL override them (e.g. a local stand-in).
+    """
+    group = org.get("group", {})
+    sources: List[IngestSource] = []
+    if os.environ.get("FAD_JIRA_TOKEN"):
+        # Jira Cloud: FAD_JIRA_USER (email) + API token as basic auth; Data Center: token alone as a bearer PAT
+        user, token = os.environ.get("FAD_JIRA_USER"), os.environ["FAD_JIRA_TOKEN"]
+        auth = {"username": user, "password": token} if user else {"token": token}
+        sources.append(JiraSource(HttpClient(os.environ.get("FAD_JIRA_URL") or group["jira_base_url"], "jira", **auth), cloud=bool(user)))
+    if os.environ.get("FAD_SERVICENOW_PASSWORD"):
+        sources.append(ServiceNowSource(HttpClient(
+            os.environ.get("FAD_SERVICENOW_URL") or group["servicenow_base_url"], "servicenow",
+            username=os.environ.get("FAD_SERVICENOW_USER"), password=os.environ["FAD_SERVICENOW_PASSWORD"],
+        )))
+    return sources
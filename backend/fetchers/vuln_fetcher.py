@@ -0,0 +1,287 @@
+import argparse
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+from app import metrics
+from app.log import log_context
+from app.models import AppConfig
+from fetchers.fetch import CLIENT_CONFIG, EXECUTOR
+from fetchers.ingest import IngestSource
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get("FAD_CVE_DB") or os.path.join(BASE_DIR, "../model/out/cve.db")
+
+SEVERITY_RANK = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3, "INFORMATIONAL": 4, "UNDEFINED": 5}
+LATEST_COUNT = 5
+# Summary for an environment the source covers but could not evaluate (no image, no scan, AWS error)
+UNSCANNED = {"open": 0, "critical": 0, "latest": [], "scanned": False}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cve (
+  id TEXT PRIMARY KEY, severity TEXT, description TEXT, published TEXT, modified TEXT
+);
+CREATE TABLE IF NOT EXISTS feed_state (
+  path TEXT PRIMARY KEY, mtime REAL, size INTEGER
+);
+CREATE TABLE IF NOT EXISTS image_scan (
+  digest TEXT PRIMARY KEY, scanned_at TEXT
+);
+CREATE TABLE IF NOT EXISTS image_finding (
+  digest TEXT, cve_id TEXT, severity TEXT, description TEXT, package TEXT,
+  PRIMARY KEY (digest, cve_id)
+);
+CREATE INDEX IF NOT EXISTS image_finding_cve ON image_finding (cve_id);
+CREATE TABLE IF NOT EXISTS image_summary (
+  digest TEXT PRIMARY KEY, open INTEGER, critical INTEGER, latest TEXT
+);
+CREATE TABLE IF NOT EXISTS env_image (
+  app TEXT, env TEXT, digest TEXT, PRIMARY KEY (app, env)
+);
+"""
+
+def nvd_records(data: dict) -> Iterable[Tuple[str, str, str, str, str]]:
+    """(id, severity, description, published, modified) from an NVD 2.0 JSON feed."""
+    for item in data.get("vulnerabilities", []):
+        cve = item.get("cve", {})
+        severity = "UNDEFINED"
+        for key in ("cvssMetricV40", "cvssMetricV31", "cvssMetricV30"):
+            for metric in cve.get("metrics", {}).get(key, []):
+                severity = metric.get("cvssData", {}).get("baseSeverity", severity)
+                break
+            if severity != "UNDEFINED":
+                break
+        description = next((d["value"] for d in cve.get("descriptions", []) if d.get("lang") == "en"), "")
+        yield cve["id"], severity.upper(), description, cve.get("published", ""), cve.get("lastModified", "")
+
+class CveIndex:
+    """Local SQLite index of CVEs and ECR image scan findings.
+
+    Findings are stored per image digest, so an image deployed to several environments
+    is correlated once. Each digest's open / critical / latest summary is precomputed
+    when its findings or the CVEs it references change, so reads are a primary key lookup.
+    """
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def load_feed(self, path: str) -> int:
+        """Upsert CVEs from an offline NVD JSON feed (optionally .gz).
+
+        Unchanged files are skipped, and only records newer than the stored copy are
+        written. Returns the number of CVEs added or updated.
+        """
+        stat = os.stat(path)
+        with self._lock:
+            state = self.db.execute("SELECT mtime, size FROM feed_state WHERE path = ?", (path,)).fetchone()
+        if state == (stat.st_mtime, stat.st_size):
+            return 0
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            records = list(nvd_records(json.load(f)))
+        with self._lock, self.db:
+            changed = [r for r in records if self._is_newer(r[0], r[4])]
+            self.db.executemany("INSERT OR REPLACE INTO cve (id, severity, description, published, modified) VALUES (?, ?, ?, ?, ?)", changed)
+            self.db.execute("INSERT OR REPLACE INTO feed_state (path, mtime, size) VALUES (?, ?, ?)", (path, stat.st_mtime, stat.st_size))
+            ids = [r[0] for r in changed]
+            digests = set()
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self.db.execute(f"SELECT DISTINCT digest FROM image_finding WHERE cve_id IN ({','.join('?' * len(chunk))})", chunk)
+                digests.update(row[0] for row in rows)
+            for digest in digests:
+                self._summarize(digest)
+        logger.info("Loaded CVE feed", extra={"path": path, "changed": len(changed), "images_resummarized": len(digests)})
+        return len(changed)
+
+    def _is_newer(self, cve_id: str, modified: str) -> bool:
+        row = self.db.execute("SELECT modified FROM cve WHERE id = ?", (cve_id,)).fetchone()
+        return row is None or (modified or "") > (row[0] or "")
+
+    def scanned_at(self, digest: str) -> Optional[str]:
+        with self._lock:
+            row = self.db.execute("SELECT scanned_at FROM image_scan WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def record_scan(self, digest: str, scanned_at: str, findings: List[dict]):
+        """Replace an image's findings ({id, severity, description, package}) and re-summarize it."""
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM image_finding WHERE digest = ?", (digest,))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO image_finding (digest, cve_id, severity, description, package) VALUES (?, ?, ?, ?, ?)",
+                [(digest, f["id"], (f.get("severity") or "UNDEFINED").upper(), f.get("description") or "", f.get("package") or "") for f in findings],
+            )
+            self.db.execute("INSERT OR REPLACE INTO image_scan (digest, scanned_at) VALUES (?, ?)", (digest, scanned_at))
+            self._summarize(digest)
+
+    def _summarize(self, digest: str):
+        # Feed data wins over the scanner's copy: it is the more current severity and description
+        rows = self.db.execute("""
+            SELECT f.cve_id, COALESCE(c.severity, f.severity), COALESCE(NULLIF(c.description, ''), f.description), COALESCE(c.published, '')
+            FROM image_finding f LEFT JOIN cve c ON c.id = f.cve_id WHERE f.digest = ?
+        """, (digest,)).fetchall()
+        # most severe first, newest first within a severity (two stable sorts)
+        ranked = sorted(sorted(rows, key=lambda r: r[3], reverse=True), key=lambda r: SEVERITY_RANK.get(r[1], 5))
+        latest = [{"id": r[0], "severity": r[1].lower(), "description": r[2], "reported": r[3]} for r in ranked[:LATEST_COUNT]]
+        critical = sum(1 for r in rows if r[1] == "CRITICAL")
+        self.db.execute("INSERT OR REPLACE INTO image_summary (digest, open, critical, latest) VALUES (?, ?, ?, ?)",
+                        (digest, len(rows), critical, json.dumps(latest)))
+
+    def summary(self, digest: str) -> Optional[dict]:
+        with self._lock:
+            row = self.db.execute("SELECT open, critical, latest FROM image_summary WHERE digest = ?", (digest,)).fetchone()
+        return {"open": row[0], "critical": row[1], "latest": json.loads(row[2])} if row else None
+
+    def set_env_image(self, app_name: str, env: str, digest: str):
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO env_image (app, env, digest) VALUES (?, ?, ?)", (app_name, env, digest))
+
+    def fleet(self) -> List[dict]:
+        """Open / critical counts for every app environment, most critical first."""
+        with self._lock:
+            rows = self.db.execute("""
+                SELECT e.app, e.env, e.digest, s.open, s.critical FROM env_image e
+                JOIN image_summary s ON s.digest = e.digest ORDER BY s.critical DESC, s.open DESC, e.app, e.env
+            """).fetchall()
+        return [{"app": r[0], "env": r[1], "digest": r[2], "open": r[3], "critical": r[4]} for r in rows]
+
+class EcrImageResolver:
+    """Resolves an environment's running image digest: pipeline -> ECS service -> task definition -> ECR image."""
+    def __init__(self):
+        self.ecs = boto3.client("ecs", config=CLIENT_CONFIG)
+        self.ecr = boto3.client("ecr", config=CLIENT_CONFIG)
+
+    def image(self, deploy_pipeline_name: str) -> Optional[Tuple[str, str, str]]:
+        """(repository, digest, scan completed at) of the environment's first ECR container, or None."""
+        # imported here: the pipeline fetcher creates its AWS clients at import time
+        from fetchers.aws_pipeline_app_fetcher import get_deployment_info
+        info = get_deployment_info(deploy_pipeline_name)
+        if not info or not info.get("cluster_name"):
+            return None
+        services = EXECUTOR.call(self.ecs, "describe_services", cluster=info["cluster_name"], services=[info["service_name"]])["services"]
+        if not services:
+            return None
+        task_definition = EXECUTOR.call(self.ecs, "describe_task_definition", taskDefinition=services[0]["taskDefinition"])["taskDefinition"]
+        image = next((c["image"] for c in task_definition["containerDefinitions"] if ".dkr.ecr." in c["image"]), None)
+        if not image:
+            return None
+        repository = image.split("/", 1)[1]
+        if "@" in repository:
+            repository, digest = repository.split("@", 1)
+            image_id = {"imageDigest": digest}
+        else:
+            repository, _, tag = repository.partition(":")
+            image_id = {"imageTag": tag or "latest"}
+        detail = EXECUTOR.call(self.ecr, "describe_images", repositoryName=repository, imageIds=[image_id])["imageDetails"][0]
+        completed = detail.get("imageScanFindingsSummary", {}).get("imageScanCompletedAt")
+        return repository, detail["imageDigest"], str(completed or "")
+
+    def findings(self, repository: str, digest: str) -> List[dict]:
+        findings, token = [], None
+        while True:
+            params = {"repositoryName": repository, "imageId": {"imageDigest": digest}, "maxResults": 1000}
+            if token:
+                params["nextToken"] = token
+            response = EXECUTOR.call(self.ecr, "describe_image_scan_findings", **params)
+            scan = response.get("imageScanFindings", {})
+            for f in scan.get("findings", []):
+                attributes = {a["key"]: a.get("value") for a in f.get("attributes", [])}
+                findings.append({"id": f["name"], "severity": f.get("severity"), "description": f.get("description"), "package": attributes.get("package_name")})
+            for f in scan.get("enhancedFindings", []):
+                details = f.get("packageVulnerabilityDetails", {})
+                package = (details.get("vulnerablePackages") or [{}])[0].get("name")
+                findings.append({"id": details.get("vulnerabilityId") or f.get("title"), "severity": f.get("severity"), "description": f.get("description"), "package": package})
+            token = response.get("nextToken")
+            if not token:
+                return findings
+
+class VulnerabilitySource(IngestSource):
+    """Per-environment vulnerability summaries from ECR scan findings correlated with the CVE index.
+
+    Each distinct image digest is fetched at most once per refresh, and only when ECR
+    reports a newer scan than the one already indexed. Images without a completed scan
+    are skipped, and an AWS error only affects the environment or image it occurred for;
+    such environments report an UNSCANNED summary.
+    """
+    name = "vulnerabilities"
+    section = "environments.security"
+
+    def __init__(self, index: CveIndex, resolver: EcrImageResolver, feed_path: Optional[str] = None):
+        self.index = index
+        self.resolver = resolver
+        self.feed_path = feed_path
+
+    def fetch(self, configs: List[AppConfig]) -> Dict[str, Any]:
+        if self.feed_path:
+            self.index.load_feed(self.feed_path)
+        seen: Dict[str, Optional[dict]] = {}
+        results: Dict[str, Any] = {}
+        for config in configs:
+            for env in config.environments:
+                with log_context(app=config.app_name, env=env.name):
+                    summary = self.env_summary(config.app_name, env.name, env.deploy_pipeline_name, seen)
+                # every covered environment gets an entry, so no placeholder data survives for it
+                results.setdefault(config.app_name, {})[env.name] = {"vulnerabilities": summary or UNSCANNED}
+        return results
+
+    def env_summary(self, app_name: str, env_name: str, pipeline: str, seen: Dict[str, Optional[dict]]) -> Optional[dict]:
+        """The environment's image summary, or None when it could not be evaluated."""
+        try:
+            resolved = self.resolver.image(pipeline)
+        except (ClientError, BotoCoreError) as e:
+            logger.warning("Could not resolve the image of %s: %s", pipeline, e)
+            return None
+        if not resolved:
+            return None
+        repository, digest, scanned_at = resolved
+        if not scanned_at:
+            logger.info("No completed ECR scan for %s@%s", repository, digest)
+            return None
+        if digest not in seen:
+            fresh = self.index.scanned_at(digest) == scanned_at
+            metrics.record_cache(self.name, fresh)
+            if not fresh:
+                try:
+                    self.index.record_scan(digest, scanned_at, self.resolver.findings(repository, digest))
+                except (ClientError, BotoCoreError) as e:
+                    # keep the digest's previous summary, if any; the scan is retried next refresh
+                    logger.warning("Could not fetch scan findings for %s@%s: %s", repository, digest, e)
+            seen[digest] = self.index.summary(digest)
+        self.index.set_env_image(app_name, env_name, digest)
+        return seen[digest]
+
+def build_vulnerability_sources() -> List[IngestSource]:
+    """Enabled by FAD_INGEST_ECR=1; FAD_CVE_FEED names the offline NVD feed file, FAD_CVE_DB the index."""
+    if os.environ.get("FAD_INGEST_ECR") != "1":
+        return []
+    return [VulnerabilitySource(CveIndex(), EcrImageResolver(), os.environ.get("FAD_CVE_FEED"))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the local CVE index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load-feed", help="Load or incrementally update CVEs from an NVD JSON feed (.json or .json.gz)")
+    load.add_argument("feed", help="Feed file")
+    sub.add_parser("fleet", help="Print open / critical counts per app environment")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Index database path")
+    args = parser.parse_args()
+
+    index = CveIndex(args.db)
+    if args.command == "load-feed":
+        print(f"Updated {index.load_feed(args.feed)} CVEs in {args.db}")
+    else:
+        for row in index.fleet():
+            print(f"{row['app']:<20} {row['env']:<6} open={row['open']:<5} critical={row['critical']:<4} {row['digest']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import pytest
+
+from tests.helpers import StandIn
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
@@ -0,0 +1,51 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from app.models import AppConfig
+
+class StandIn:
+    """Local HTTP server standing in for Jira / ServiceNow / GitHub.
+
+    `routes` maps a path to fn(query, headers) -> (status, response headers, JSON body);
+    every request is recorded in `requests` as (path, query, headers).
+    """
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stand_in.requests.append((url.path, query, dict(self.headers)))
+                status, headers, body = stand_in.routes[url.path](query, self.headers)
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+def app_config(name, jira=None, servicenow=None, git_origin_url="https://example.com/repo", branches=("dev",)):
+    return AppConfig(
+        app_name=name,
+        app_desc=f"{name} app",
+        source={"project_name": name, "git_origin_url": git_origin_url, "aws": {"account_name": "finapps-dev"}},
+        jira={"project_key": jira} if jira else None,
+        servicenow={"cmdb_ci": servicenow} if servicenow else None,
+        environments=[{
+            "name": env, "git_branch": env, "app_profile": "tomcat-java", "deploy_profile": "aws-cicd-fargate",
+            "deploy_pipeline_name": f"pipeline-{name}-{env}", "aws": {"account_name": "finapps-dev"},
+        } for env in branches],
+    )
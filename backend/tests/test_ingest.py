@@ -0,0 +1,135 @@
+from fetchers.commit_fetcher import GitHubSource
+from fetchers.ingest import HttpClient
+from fetchers.ticket_fetcher import JiraSource, ServiceNowSource
+from tests.helpers import app_config
+
+def jira_issue(key, project, status="Open", category="new", created="2026-10-01T10:00:00.000+0000", updated=None):
+    return {"key": key, "fields": {
+        "summary": f"{key} summary", "description": None, "project": {"key": project},
+        "status": {"name": status, "statusCategory": {"key": category}},
+        "created": created, "updated": updated or created,
+    }}
+
+def test_http_client_serves_304_from_cache(stand_in):
+    def route(query, headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, {}, None
+        return 200, {"ETag": '"v1"'}, {"value": 1}
+    stand_in.routes["/thing"] = route
+    client = HttpClient(stand_in.url, "test")
+
+    assert client.get_json("/thing") == {"value": 1}
+    assert client.get_json("/thing") == {"value": 1}
+    assert [r[2].get("If-None-Match") for r in stand_in.requests] == [None, '"v1"']
+
+def test_http_client_cache_is_bounded_and_optional(stand_in):
+    stand_in.routes["/thing"] = lambda query, headers: (200, {"ETag": '"v1"'}, {"id": query.get("id")})
+    client = HttpClient(stand_in.url, "test", max_entries=2)
+
+    for i in range(3):
+        client.get_json("/thing", {"id": i})
+    client.get_json("/thing", {"id": "once"}, cache=False)
+
+    assert list(client._cache) == [client.url("/thing", {"id": 1}), client.url("/thing", {"id": 2})]
+
+def test_jira_data_center_bulk_search_paginates_then_queries_incrementally(stand_in):
+    issues = [jira_issue("A-1", "A"), jira_issue("A-2", "A", created="2026-10-02T10:00:00.000+0000"), jira_issue("B-1", "B")]
+
+    def search(query, headers):
+        start, size = int(query["startAt"]), int(query["maxResults"])
+        return 200, {}, {"total": len(issues), "issues": issues[start:start + size]}
+    stand_in.routes["/rest/api/2/search"] = search
+    source = JiraSource(HttpClient(stand_in.url, "jira"), page_size=2, cloud=False)
+    configs = [app_config("alpha", jira="A"), app_config("beta", jira="B"), app_config("gamma")]
+
+    results = source.fetch(configs)
+
+    assert [r[1]["startAt"] for r in stand_in.requests] == ["0", "2"]
+    assert all(r[1]["jql"].startswith('project in ("A", "B") AND (statusCategory != Done') for r in stand_in.requests)
+    assert results["alpha"]["tickets"]["open"] == 2
+    assert [t["id"] for t in results["alpha"]["tickets"]["latest"]] == ["A-2", "A-1"]
+    assert results["beta"]["tickets"]["open"] == 1
+    assert "gamma" not in results
+
+    # the next run only asks for recent updates and merges them into the cache
+    issues[:] = [jira_issue("A-1", "A", status="Done", category="done", updated="2026-10-19T10:00:00.000+0000")]
+    stand_in.requests.clear()
+    results = source.fetch(configs)
+
+    assert len(stand_in.requests) == 1
+    assert stand_in.requests[0][1]["jql"] == 'project in ("A", "B") AND updated >= -5m ORDER BY updated DESC'
+    assert results["alpha"]["tickets"]["open"] == 1
+    assert results["beta"]["tickets"]["open"] == 1
+
+def test_jira_cloud_search_follows_next_page_token(stand_in):
+    pages = {
+        None: {"issues": [jira_issue("A-1", "A")], "nextPageToken": "p2", "isLast": False},
+        "p2": {"issues": [jira_issue("A-2", "A", created="2026-10-02T10:00:00.000+0000")], "isLast": True},
+    }
+    pages["p2"]["issues"][0]["fields"]["description"] = {"type": "doc", "version": 1, "content": [
+        {"type": "paragraph", "content": [{"type": "text", "text": "Login "}, {"type": "text", "text": "fails"}]},
+        {"type": "paragraph", "content": [{"type": "text", "text": "on prod"}]},
+    ]}
+    stand_in.routes["/rest/api/3/search/jql"] = lambda query, headers: (200, {}, pages[query.get("nextPageToken")])
+    source = JiraSource(HttpClient(stand_in.url, "jira"), page_size=1)
+
+    results = source.fetch([app_config("alpha", jira="A")])
+
+    assert [r[1].get("nextPageToken") for r in stand_in.requests] == [None, "p2"]
+    assert all(r[1]["jql"].startswith('project in ("A") AND') and "startAt" not in r[1] for r in stand_in.requests)
+    assert results["alpha"]["tickets"]["open"] == 2
+    assert results["alpha"]["tickets"]["latest"][0]["description"] == "Login fails\non prod"
+
+def test_servicenow_drops_closed_incidents(stand_in):
+    records = [
+        {"number": "INC1", "short_description": "down", "active": "true", "cmdb_ci.name": "alpha-ci", "opened_at": "2026-10-01 10:00:00",
+         "due_date": "2026-10-02 10:00:00", "impact": "1"},
+        {"number": "INC2", "short_description": "slow", "active": "true", "cmdb_ci.name": "alpha-ci", "opened_at": "2026-10-02 10:00:00",
+         "due_date": "2999-01-01 00:00:00", "impact": "3"},
+    ]
+    stand_in.routes["/api/now/table/incident"] = lambda query, headers: (200, {}, {"result": records})
+    source = ServiceNowSource(HttpClient(stand_in.url, "servicenow"))
+    configs = [app_config("alpha", servicenow="alpha-ci")]
+
+    results = source.fetch(configs)
+
+    assert results["alpha"]["open"] == 2
+    assert results["alpha"]["overdue"] == 1
+    assert [t["impact"] for t in results["alpha"]["tickets"]] == ["3 - Low", "1 - High"]
+    assert stand_in.requests[0][1]["sysparm_query"] == "cmdb_ci.nameINalpha-ci^active=true"
+    assert stand_in.requests[0][1]["sysparm_display_value"] == "false"
+
+    records[:] = [{"number": "INC1", "active": "false", "cmdb_ci.name": "alpha-ci"}]
+    results = source.fetch(configs)
+
+    assert stand_in.requests[1][1]["sysparm_query"] == "cmdb_ci.nameINalpha-ci^sys_updated_onRELATIVEGE@minute@ago@5"
+    assert results["alpha"]["open"] == 1
+    assert [t["id"] for t in results["alpha"]["tickets"]] == ["INC2"]
+
+def test_github_commits_per_branch_with_conditional_requests(stand_in):
+    commits = {
+        "dev": [{"sha": "d1", "commit": {"message": "dev change\n\ndetails", "committer": {"date": "2026-10-02T10:00:00Z"}}}],
+        "main": [{"sha": "m1", "commit": {"message": "main change", "committer": {"date": "2026-10-01T10:00:00Z"}}}],
+    }
+
+    def route(query, headers):
+        etag = f'"{query["sha"]}"'
+        if headers.get("If-None-Match") == etag:
+            return 304, {}, None
+        return 200, {"ETag": etag}, commits[query["sha"]]
+    stand_in.routes["/repos/org/alpha/commits"] = route
+    source = GitHubSource(HttpClient(stand_in.url, "github", token="t"))
+    configs = [
+        app_config("alpha", git_origin_url="https://github.com/org/alpha.git", branches=("dev", "prod")),
+        app_config("beta", git_origin_url="https://gitlab.com/org/beta"),
+    ]
+    configs[0].environments[1].git_branch = "main"
+
+    first = source.fetch(configs)
+    second = source.fetch(configs)
+
+    assert [(c["id"], c["message"], c["branch"]) for c in first["alpha"]] == [("d1", "dev change", "dev"), ("m1", "main change", "main")]
+    assert second == first
+    assert "beta" not in first
+    assert [r[2].get("If-None-Match") for r in stand_in.requests] == [None, None, '"dev"', '"main"']
+    assert stand_in.requests[0][2]["Authorization"] == "Bearer t"
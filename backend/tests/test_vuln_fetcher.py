@@ -0,0 +1,62 @@
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from fetchers.vuln_fetcher import UNSCANNED, CveIndex, VulnerabilitySource
+from tests.helpers import app_config
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "DescribeImageScanFindings")
+
+class StubResolver:
+    """Stands in for EcrImageResolver: pipeline -> (repository, digest, scanned_at) or an exception."""
+    def __init__(self, images, findings):
+        self.images = images
+        self._findings = findings
+        self.findings_calls = []
+
+    def image(self, pipeline):
+        image = self.images[pipeline]
+        if isinstance(image, Exception):
+            raise image
+        return image
+
+    def findings(self, repository, digest):
+        self.findings_calls.append(digest)
+        findings = self._findings[digest]
+        if isinstance(findings, Exception):
+            raise findings
+        return findings
+
+def test_one_bad_image_does_not_break_the_sweep(tmp_path):
+    resolver = StubResolver(
+        images={
+            "pipeline-alpha-dev": ("alpha", "sha256:scanned", "2026-10-18 10:00:00"),
+            "pipeline-alpha-prod": ("alpha", "sha256:unscanned", ""),
+            "pipeline-beta-dev": client_error("ClusterNotFoundException"),
+            "pipeline-gamma-dev": ("gamma", "sha256:failing", "2026-10-18 10:00:00"),
+            "pipeline-delta-dev": EndpointConnectionError(endpoint_url="https://ecs.us-east-1.amazonaws.com"),
+            "pipeline-delta-prod": ("delta", "sha256:unreachable", "2026-10-18 10:00:00"),
+        },
+        findings={
+            "sha256:scanned": [{"id": "CVE-2026-0001", "severity": "CRITICAL", "description": "bad", "package": "openssl"}],
+            "sha256:failing": client_error("ThrottlingException"),
+            "sha256:unreachable": EndpointConnectionError(endpoint_url="https://api.ecr.us-east-1.amazonaws.com"),
+        },
+    )
+    source = VulnerabilitySource(CveIndex(str(tmp_path / "cve.db")), resolver)
+    configs = [app_config("alpha", branches=("dev", "prod")), app_config("beta"), app_config("gamma"), app_config("delta", branches=("dev", "prod"))]
+
+    results = source.fetch(configs)
+
+    assert results["alpha"]["dev"] == {"vulnerabilities": {
+        "open": 1, "critical": 1,
+        "latest": [{"id": "CVE-2026-0001", "severity": "critical", "description": "bad", "reported": ""}],
+    }}
+    # environments that could not be evaluated are reported unscanned rather than left out
+    unscanned = [(app, env) for app, envs in results.items() for env, value in envs.items() if value == {"vulnerabilities": UNSCANNED}]
+    assert unscanned == [("alpha", "prod"), ("beta", "dev"), ("gamma", "dev"), ("delta", "dev"), ("delta", "prod")]
+    assert resolver.findings_calls == ["sha256:scanned", "sha256:failing", "sha256:unreachable"]
+
+    # an unchanged scan is served from the index without another findings call
+    resolver.findings_calls.clear()
+    assert source.fetch(configs) == results
+    assert resolver.findings_calls == ["sha256:failing", "sha256:unreachable"]